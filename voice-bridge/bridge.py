@@ -5,8 +5,8 @@ the minhome server over a single WebSocket connection.
 
 Protocol:
   1. Discover ESPHome devices via mDNS (_esphomelib._tcp.local.)
-  2. Probe each for voice_assistant feature flags
-  3. Maintain persistent connections to qualifying devices (ReconnectLogic)
+  2. Connect to each (ReconnectLogic) and check voice_assistant feature flags
+  3. Keep persistent connections to qualifying devices, release the rest
   4. On wake word → device streams audio over the API connection
   5. Forward resampled 24 kHz PCM audio to minhome at ws://HOST:PORT/ws/voice
   6. Server manages OpenAI Realtime session, sends control events back
@@ -19,6 +19,10 @@ import asyncio
 import json
 import logging
 import os
+import signal
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
 from typing import Any
 
 import numpy as np
@@ -36,6 +40,16 @@ from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
 
 from websockets.asyncio.client import connect as ws_connect
 
+# Voice assistant events sent to devices, bound once at import
+_EV_RUN_START = VoiceAssistantEventType.VOICE_ASSISTANT_RUN_START
+_EV_STT_START = VoiceAssistantEventType.VOICE_ASSISTANT_STT_START
+_EV_STT_VAD_START = VoiceAssistantEventType.VOICE_ASSISTANT_STT_VAD_START
+_EV_STT_VAD_END = VoiceAssistantEventType.VOICE_ASSISTANT_STT_VAD_END
+_EV_TTS_START = VoiceAssistantEventType.VOICE_ASSISTANT_TTS_START
+_EV_TTS_END = VoiceAssistantEventType.VOICE_ASSISTANT_TTS_END
+_EV_ERROR = VoiceAssistantEventType.VOICE_ASSISTANT_ERROR
+_EV_RUN_END = VoiceAssistantEventType.VOICE_ASSISTANT_RUN_END
+
 # ---------------------------------------------------------------------------
 # Configuration via environment
 # ---------------------------------------------------------------------------
@@ -50,6 +64,31 @@ ESPHOME_PORT = int(os.environ.get("ESPHOME_PORT", "6053"))
 # Max seconds of audio to capture per pipeline run (hard timeout)
 MAX_PIPELINE_DURATION = float(os.environ.get("MAX_PIPELINE_DURATION", "30"))
 
+# Forwarded audio is coalesced into WebSocket frames instead of one frame
+# per device chunk. A frame is sent once it holds 60 ms of 24 kHz 16-bit
+# mono, or once 40 ms have passed since the last send, whichever is first.
+AUDIO_SEND_BYTES = 24000 * 2 * 60 // 1000
+AUDIO_SEND_INTERVAL = 0.04
+
+# Device audio buffered between the ESPHome callback and the forwarding
+# task (2 s of 16 kHz 16-bit mono); the oldest audio is overwritten if the
+# forwarder falls further behind than this
+AUDIO_BUFFER_BYTES = 16000 * 2 * 2
+
+# Minimum seconds between audio buffer overflow warnings per device
+AUDIO_OVERFLOW_LOG_INTERVAL = 1.0
+
+# minhome WebSocket keepalive, and reconnect backoff bounds (seconds)
+WS_PING_INTERVAL = 20.0
+WS_OPEN_TIMEOUT = 5.0
+WS_RECONNECT_MIN_DELAY = 1.0
+WS_RECONNECT_MAX_DELAY = 30.0
+
+# Audio frames waiting for the WebSocket writer; if a stalled connection
+# lets more than this pile up, the oldest frames are dropped (queued control
+# messages are never dropped)
+WS_SEND_QUEUE_FRAMES = 64
+
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 
 # ---------------------------------------------------------------------------
@@ -61,28 +100,220 @@ logging.basicConfig(
 )
 log = logging.getLogger("voice-bridge")
 
+# Compact encoder for WebSocket control messages (stdlib C encoder, no
+# whitespace between tokens)
+_json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# Fixed-shape control messages, filled with _json_encode()d field values
+_VOICE_START_JSON = '{"type":"voice_start","device_id":%s,"conversation_id":%s,"wake_word":%s}'
+_DEVICE_DISCONNECTED_JSON = '{"type":"device_disconnected","device_id":%s}'
+
 
 # ---------------------------------------------------------------------------
 # Audio resampling helpers (16 kHz → 24 kHz)
 # ---------------------------------------------------------------------------
 
-def resample_16_to_24(pcm16: bytes) -> bytes:
-    """Resample 16-bit PCM from 16 kHz to 24 kHz (ratio 1.5) using linear interpolation."""
-    samples = np.frombuffer(pcm16, dtype=np.int16).astype(np.float32)
-    n_in = len(samples)
-    if n_in == 0:
-        return b""
-    n_out = int(n_in * 24000 / 16000)
-    x_in = np.arange(n_in)
-    x_out = np.linspace(0, n_in - 1, n_out)
-    resampled = np.interp(x_out, x_in, samples)
-    return resampled.clip(-32768, 32767).astype(np.int16).tobytes()
+# Lowpass for the 3:2 resampler, designed at the 48 kHz intermediate rate
+# (16 kHz x 3). The cutoff sits below the 8 kHz input Nyquist so the
+# spectral images that linear interpolation leaks into 8-12 kHz are
+# suppressed before they reach speech recognition. 48 taps = 16 per phase.
+RESAMPLE_FIR_TAPS = 48
+RESAMPLE_FIR_CUTOFF_HZ = 7500
+
+
+def _design_resample_fir() -> np.ndarray:
+    """Kaiser-windowed sinc, split into one row per polyphase branch.
+
+    Row p holds taps h[p::3] in reverse order, so its dot product with a
+    16-sample input window (oldest sample first) gives output phase p. Each
+    row is normalized to unity DC gain.
+    """
+    n = np.arange(RESAMPLE_FIR_TAPS) - (RESAMPLE_FIR_TAPS - 1) / 2
+    h = np.sinc(2 * RESAMPLE_FIR_CUTOFF_HZ / 48000 * n) * np.kaiser(RESAMPLE_FIR_TAPS, 6.0)
+    phases = h.reshape(-1, 3)[::-1].T
+    phases /= phases.sum(axis=1, keepdims=True)
+    return np.ascontiguousarray(phases, dtype=np.float32)
+
+
+_RESAMPLE_FIR = _design_resample_fir()
+_RESAMPLE_HISTORY = _RESAMPLE_FIR.shape[1] - 1
+# Phases 0 and 2 filter windows ending on the first sample of each input
+# pair, phase 1 the window ending on the second
+_RESAMPLE_FIR_EVEN = np.ascontiguousarray(_RESAMPLE_FIR[[0, 2]])
+_RESAMPLE_FIR_ODD = np.ascontiguousarray(_RESAMPLE_FIR[1:2])
+
+
+class Resampler16To24:
+    """Streaming resampler for 16-bit PCM from 16 kHz to 24 kHz (ratio 3:2).
+
+    A polyphase FIR: the input is treated as zero-stuffed to 48 kHz,
+    lowpass filtered and decimated by 2, with only the needed phases
+    computed. Each input pair x[2q], x[2q+1] yields three outputs: phases
+    0 and 2 of the window ending at x[2q], and phase 1 of the window ending
+    at x[2q+1]. The filter history (and any unpaired sample) is carried
+    across calls, so chunk boundaries filter like the middle of a stream.
+
+    resample() returns a view of an internal buffer that is only valid
+    until the next call; copy it out (e.g. into a send buffer) first.
+    """
+
+    def __init__(self) -> None:
+        # float32 working copy of the input, with the carried history at the
+        # front; the input windows and filtered phases; and the int16 output.
+        # All are reused across calls and only grow when a larger chunk
+        # arrives.
+        self._work = np.zeros(_RESAMPLE_HISTORY, dtype=np.float32)
+        self._windows = np.empty((_RESAMPLE_HISTORY + 2, 0), dtype=np.float32)
+        self._phases = np.empty((3, 0), dtype=np.float32)
+        self._out = np.empty(0, dtype=np.int16)
+        self._n_carry = _RESAMPLE_HISTORY
+
+    def reset(self) -> None:
+        """Clear filter history (call at the start of each audio stream)."""
+        self._work[:_RESAMPLE_HISTORY] = 0
+        self._n_carry = _RESAMPLE_HISTORY
+
+    def resample(self, pcm16: bytes) -> memoryview:
+        samples = np.frombuffer(pcm16, dtype=np.int16)
+        n_carry = self._n_carry
+        n = n_carry + len(samples)
+        if len(self._work) < n:
+            work = np.empty(n, dtype=np.float32)
+            work[:n_carry] = self._work[:n_carry]
+            self._work = work
+        s = self._work
+        s[n_carry:n] = samples
+
+        n_pairs = (n - _RESAMPLE_HISTORY) // 2
+        if n_pairs <= 0:
+            self._n_carry = n
+            return memoryview(b"")
+        rows = 2 * n_pairs
+        if len(self._out) < 3 * n_pairs:
+            self._windows = np.empty((_RESAMPLE_HISTORY + 2, n_pairs), dtype=np.float32)
+            self._phases = np.empty((3, n_pairs), dtype=np.float32)
+            self._out = np.empty(3 * n_pairs, dtype=np.int16)
+
+        # Row k of the windows holds s[k], s[k + 2], ..., so column q of rows
+        # 0..15 is the window ending on the first sample of pair q and column
+        # q of rows 1..16 the window ending on the second. Each phase is then
+        # computed only for the pairs it is used on, with both matmuls on
+        # contiguous row slices (BLAS), ~2x faster than a strided
+        # sliding_window_view.
+        end = _RESAMPLE_HISTORY + rows
+        windows = self._windows[:, :n_pairs]
+        for k in range(_RESAMPLE_HISTORY + 2):
+            windows[k] = s[k:k + rows:2]
+        y = self._phases[:, :n_pairs]
+        np.matmul(_RESAMPLE_FIR_EVEN, windows[:-1], out=y[:2])
+        np.matmul(_RESAMPLE_FIR_ODD, windows[1:], out=y[2:])
+        np.rint(y, out=y)
+        np.clip(y, -32768, 32767, out=y)
+        # Interleave phases 0, 2, 1 per pair
+        out = self._out[:3 * n_pairs]
+        np.copyto(out.reshape(n_pairs, 3), y.T, casting="unsafe")
+
+        # Keep the filter history and any unpaired sample for next time
+        self._n_carry = n - end + _RESAMPLE_HISTORY
+        s[:self._n_carry] = s[end - _RESAMPLE_HISTORY:n]
+        return out.data.cast("B")
+
+
+# ---------------------------------------------------------------------------
+# AudioRing — device audio buffer between callback and forwarding task
+# ---------------------------------------------------------------------------
+
+class AudioRing:
+    """Fixed-capacity byte ring with a single writer and a single reader.
+
+    The ESPHome audio callback writes chunks in and the forwarding task
+    takes everything buffered in one read, so a backlog is resampled and
+    sent as one batch. Nothing is allocated per write. When full, the
+    oldest audio is overwritten.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._len = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def reset(self) -> None:
+        """Drop buffered audio and reopen for a new stream."""
+        self._start = 0
+        self._len = 0
+        self._closed = False
+        self._ready.clear()
+
+    def close(self) -> None:
+        """Mark the end of the stream; buffered audio can still be read."""
+        self._closed = True
+        self._ready.set()
+
+    def write(self, data: bytes) -> int:
+        """Append audio, returning how many old bytes were overwritten."""
+        if self._closed:
+            return 0
+        cap = len(self._buf)
+        n = len(data)
+        dropped = 0
+        if n > cap:
+            data = memoryview(data)[n - cap:]
+            dropped = n - cap
+            n = cap
+        overflow = self._len + n - cap
+        if overflow > 0:
+            self._start = (self._start + overflow) % cap
+            self._len -= overflow
+            dropped += overflow
+
+        end = (self._start + self._len) % cap
+        first = min(n, cap - end)
+        self._view[end:end + first] = data[:first]
+        self._view[:n - first] = data[first:]
+        self._len += n
+        self._ready.set()
+        return dropped
+
+    def read(self) -> bytes:
+        """Remove and return all buffered audio."""
+        start, n = self._start, self._len
+        end = start + n
+        if end <= len(self._buf):
+            data = bytes(self._view[start:end])
+        else:
+            data = b"".join((self._view[start:], self._view[:end - len(self._buf)]))
+        self._start = 0
+        self._len = 0
+        return data
+
+    async def wait(self) -> None:
+        """Wait until audio is buffered or the stream is closed."""
+        if not self._len and not self._closed:
+            await self._ready.wait()
+        self._ready.clear()
 
 
 # ---------------------------------------------------------------------------
 # DeviceHandler — manages one ESPHome voice assistant device
 # ---------------------------------------------------------------------------
 
+@dataclass(slots=True, frozen=True)
+class DeviceInfo:
+    """Device details reported to minhome in device_connected / devices_list."""
+
+    device_id: str
+    name: str
+    model: str
+    version: str
+
+
 class DeviceHandler:
     """Manages a single ESPHome voice assistant device connection."""
 
@@ -95,6 +326,7 @@ class DeviceHandler:
         self.host = host
         self.device_name = device_name
         self.device_id = device_name  # used in WS protocol
+        self._device_id_json = _json_encode(self.device_id)
         self.manager = manager
 
         noise_psk = ESPHOME_NOISE_PSK or None
@@ -104,9 +336,19 @@ class DeviceHandler:
             ESPHOME_PASSWORD,
             noise_psk=noise_psk,
         )
-        self._audio_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        # Audio from the device, drained in batches by _forward_audio
+        self._audio = AudioRing(AUDIO_BUFFER_BYTES)
+        self._resampler = Resampler16To24()
+        self._forward_task: asyncio.Task | None = None
+        self._overflow_bytes = 0  # dropped since the last overflow warning
+        self._overflow_logged_at = 0.0
         self._reconnect: ReconnectLogic | None = None
-        self._device_info: dict[str, str] | None = None  # cached info for WS reconnects
+        self._device_info: DeviceInfo | None = None  # cached info for WS reconnects
+
+    @property
+    def confirmed(self) -> bool:
+        """Whether voice support has been confirmed and the server told of it."""
+        return self._device_info is not None
 
     async def start(self) -> None:
         """Start the reconnection logic for this device."""
@@ -145,40 +387,54 @@ class DeviceHandler:
             device_info.esphome_version,
         )
 
+        flags = device_info.voice_assistant_feature_flags_compat(self.cli.api_version)
+        if not flags & VoiceAssistantFeature.VOICE_ASSISTANT:
+            log.debug("[%s] Ignoring non-voice device (flags=%d)", self.device_id, flags)
+            self.manager.release_device(self, non_voice=True)
+            return
+
         # Cache device info so we can re-send it on WS reconnects
-        self._device_info = {
-            "name": device_info.name,
-            "model": device_info.model,
-            "version": device_info.esphome_version,
-        }
+        self._device_info = DeviceInfo(
+            device_id=self.device_id,
+            name=device_info.name,
+            model=device_info.model,
+            version=device_info.esphome_version,
+        )
 
         self.cli.subscribe_voice_assistant(
             handle_start=self._handle_pipeline_start,
             handle_stop=self._handle_pipeline_stop,
             handle_audio=self._handle_audio,
         )
-        log.info("[%s] Subscribed to voice assistant events", self.device_id)
+        log.info(
+            "[%s] Managing voice device — subscribed to voice assistant events (flags=%d)",
+            self.device_id, flags,
+        )
 
         # Notify the server that this device is connected
-        await self.manager.ws_send_json({
+        self.manager.ws_send_json({
             "type": "device_connected",
-            "device_id": self.device_id,
-            "name": device_info.name,
-            "model": device_info.model,
-            "version": device_info.esphome_version,
+            **asdict(self._device_info),
         })
 
     async def _on_disconnect(self, expected_disconnect: bool) -> None:
+        if not self.confirmed:
+            return  # never reported to the server (e.g. released non-voice device)
         log.warning(
             "[%s] Disconnected (expected=%s)", self.device_id, expected_disconnect
         )
         # Notify the server that this device is disconnected
-        await self.manager.ws_send_json({
-            "type": "device_disconnected",
-            "device_id": self.device_id,
-        })
+        self.manager.ws_send_text(
+            _DEVICE_DISCONNECTED_JSON % self._device_id_json, "device_disconnected"
+        )
 
     async def _on_connect_error(self, exc: Exception) -> None:
+        if not self.confirmed:
+            # Never got far enough to check voice support (e.g. the device
+            # has its own encryption key); give up rather than retry forever
+            log.warning("Failed to probe %s: %s", self.device_id, exc)
+            self.manager.release_device(self)
+            return
         log.error("[%s] Connection error: %s", self.device_id, exc)
 
     # -- Voice assistant handlers ----------------------------------------------
@@ -195,85 +451,133 @@ class DeviceHandler:
             self.device_id, conversation_id, wake_word_phrase, flags,
         )
 
-        # Drain any leftover audio
-        while not self._audio_queue.empty():
-            try:
-                self._audio_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        # audio_settings carries only noise suppression, auto gain and the
+        # volume multiplier. The ESPHome voice assistant API has no sample
+        # rate field, since devices always stream 16 kHz 16-bit mono, so
+        # every stream goes through the 16 → 24 kHz resampler.
+
+        # The ring and resampler are shared per device: stop a forwarder
+        # still draining the previous stream before they are reset
+        if self._forward_task is not None and not self._forward_task.done():
+            self._forward_task.cancel()
+            # Wait without re-raising: a task cancelled before its first
+            # step never reaches _forward_audio's handler and ends cancelled
+            await asyncio.wait({self._forward_task})
+
+        # Drop any leftover audio
+        self._audio.reset()
+        self._resampler.reset()
+
+        # Send initial pipeline events so the device shows correct LEDs.
+        # These are plain writes on the API connection, independent of the
+        # minhome WebSocket queue below.
+        self.cli.send_voice_assistant_event(_EV_RUN_START, {})
+        self.cli.send_voice_assistant_event(_EV_STT_START, {})
+        self.cli.send_voice_assistant_event(_EV_STT_VAD_START, {})
 
         # Tell minhome a voice session has started (with device_id)
-        await self.manager.ws_send_json({
-            "type": "voice_start",
-            "device_id": self.device_id,
-            "conversation_id": conversation_id,
-            "wake_word": wake_word_phrase or "",
-        })
+        self.manager.ws_send_text(
+            _VOICE_START_JSON % (
+                self._device_id_json,
+                _json_encode(conversation_id),
+                _json_encode(wake_word_phrase or ""),
+            ),
+            "voice_start",
+        )
 
         # Register this device as the active streamer
         self.manager.set_active_streamer(self.device_id)
 
-        # Send initial pipeline events so the device shows correct LEDs
-        self.cli.send_voice_assistant_event(
-            VoiceAssistantEventType.VOICE_ASSISTANT_RUN_START, {}
-        )
-        self.cli.send_voice_assistant_event(
-            VoiceAssistantEventType.VOICE_ASSISTANT_STT_START, {}
-        )
-        self.cli.send_voice_assistant_event(
-            VoiceAssistantEventType.VOICE_ASSISTANT_STT_VAD_START, {}
-        )
-
         # Kick off the audio forwarding task
-        asyncio.get_running_loop().create_task(self._forward_audio(conversation_id))
+        self._forward_task = asyncio.get_running_loop().create_task(
+            self._forward_audio(conversation_id)
+        )
 
         # Return port=0 → device sends audio over the API (TCP) connection
         return 0
 
     async def _handle_audio(self, data: bytes) -> None:
-        self._audio_queue.put_nowait(data)
+        dropped = self._audio.write(data)
+        if dropped:
+            # A stalled forwarder overflows on every chunk; summarise rather
+            # than logging each one
+            self._overflow_bytes += dropped
+            now = time.monotonic()
+            if now - self._overflow_logged_at >= AUDIO_OVERFLOW_LOG_INTERVAL:
+                log.warning(
+                    "[%s] Audio buffer overflow — dropped %d oldest bytes",
+                    self.device_id, self._overflow_bytes,
+                )
+                self._overflow_bytes = 0
+                self._overflow_logged_at = now
 
     async def _handle_pipeline_stop(self, abort: bool) -> None:
         log.info("[%s] Pipeline stop — abort=%s", self.device_id, abort)
-        self._audio_queue.put_nowait(None)
+        self._audio.close()
 
     async def _forward_audio(self, conversation_id: str) -> None:
-        """Read audio from the queue, resample 16kHz → 24kHz, and forward to minhome."""
+        """Drain buffered audio, resample 16kHz → 24kHz, and forward to minhome."""
         total_bytes = 0
-        deadline = asyncio.get_event_loop().time() + MAX_PIPELINE_DURATION
         stop_reason = "unknown"
+        audio = self._audio
+        send_buf = bytearray()
+        expired = False
+        loop = asyncio.get_running_loop()
+        last_send = loop.time()
+
+        def expire() -> None:
+            nonlocal expired
+            expired = True
+            audio.close()
+
+        def send_frame() -> None:
+            nonlocal send_buf, last_send
+            # Hand the buffer to the WS writer rather than copying it
+            self.manager.ws_send_binary(send_buf)
+            send_buf = bytearray()
+            last_send = loop.time()
+
+        # One timer for the whole pipeline instead of a timeout per wait
+        timer = loop.call_later(MAX_PIPELINE_DURATION, expire)
 
         try:
             while True:
-                remaining = deadline - asyncio.get_event_loop().time()
-                if remaining <= 0:
+                # Wake once per batch of chunks rather than once per chunk
+                await audio.wait()
+                if expired:
                     stop_reason = f"max duration ({MAX_PIPELINE_DURATION:.0f}s)"
                     break
 
-                try:
-                    chunk = await asyncio.wait_for(
-                        self._audio_queue.get(),
-                        timeout=min(remaining, 0.5),
-                    )
-                except asyncio.TimeoutError:
-                    if asyncio.get_event_loop().time() >= deadline:
-                        stop_reason = f"max duration ({MAX_PIPELINE_DURATION:.0f}s)"
-                        break
-                    continue
-
-                if chunk is None:
+                data = audio.read()
+                if data and not self.manager.is_active(self.device_id):
+                    # Another device took over (or the server went away);
+                    # minhome would discard this audio, so skip the resample
+                    data = b""
+                if data:
+                    total_bytes += len(data)
+
+                    # Resample 16kHz → 24kHz and send as binary once a full
+                    # frame has accumulated, or a partial one has waited
+                    # long enough while audio trickles in
+                    send_buf += self._resampler.resample(data)
+                    if (
+                        len(send_buf) >= AUDIO_SEND_BYTES
+                        or loop.time() - last_send >= AUDIO_SEND_INTERVAL
+                    ):
+                        send_frame()
+
+                if audio.closed:
                     stop_reason = "device stopped"
                     break
 
-                total_bytes += len(chunk)
-
-                # Resample 16kHz → 24kHz and send as binary
-                resampled = resample_16_to_24(chunk)
-                await self.manager.ws_send_binary(resampled)
+            # Flush the partial frame left at end of stream
+            if send_buf:
+                send_frame()
 
         except asyncio.CancelledError:
             stop_reason = "cancelled"
         finally:
+            timer.cancel()
             duration = total_bytes / (16000 * 2) if total_bytes else 0
             log.info(
                 "[%s] Audio forwarding done — %s — %d bytes (~%.1fs of 16kHz audio)",
@@ -288,39 +592,28 @@ class DeviceHandler:
 
         if msg_type == "speech_stopped":
             log.info("[%s] Server: speech_stopped → sending STT_VAD_END", self.device_id)
-            self.cli.send_voice_assistant_event(
-                VoiceAssistantEventType.VOICE_ASSISTANT_STT_VAD_END, {}
-            )
+            self.cli.send_voice_assistant_event(_EV_STT_VAD_END, {})
 
         elif msg_type == "tts_start":
             audio_path = msg.get("audio_path", "")
             audio_url = f"{MINHOME_AUDIO_BASE_URL}{audio_path}"
             log.info("[%s] Server: tts_start → sending TTS events (url=%s)", self.device_id, audio_url)
 
-            self.cli.send_voice_assistant_event(
-                VoiceAssistantEventType.VOICE_ASSISTANT_TTS_START,
-                {"url": audio_url},
-            )
-            self.cli.send_voice_assistant_event(
-                VoiceAssistantEventType.VOICE_ASSISTANT_TTS_END,
-                {"url": audio_url},
-            )
+            self.cli.send_voice_assistant_event(_EV_TTS_START, {"url": audio_url})
+            self.cli.send_voice_assistant_event(_EV_TTS_END, {"url": audio_url})
 
         elif msg_type == "voice_error":
             error_code = msg.get("code", "server-error")
             error_message = msg.get("message", "An error occurred")
             log.warning("[%s] Server: voice_error (%s) → sending ERROR event", self.device_id, error_code)
             self.cli.send_voice_assistant_event(
-                VoiceAssistantEventType.VOICE_ASSISTANT_ERROR,
-                {"code": error_code, "message": error_message},
+                _EV_ERROR, {"code": error_code, "message": error_message}
             )
 
         elif msg_type == "voice_done":
             conv_id = msg.get("conversation_id", "")
             log.info("[%s] Server: voice_done (conversation=%s) → sending RUN_END", self.device_id, conv_id)
-            self.cli.send_voice_assistant_event(
-                VoiceAssistantEventType.VOICE_ASSISTANT_RUN_END, {}
-            )
+            self.cli.send_voice_assistant_event(_EV_RUN_END, {})
             # Clear active streamer if it's this device
             self.manager.clear_active_streamer(self.device_id)
 
@@ -329,7 +622,7 @@ class DeviceHandler:
             audio_url = f"{MINHOME_AUDIO_BASE_URL}{audio_path}"
             announce_id = msg.get("announce_id", "")
             log.info("[%s] Server: announce (id=%s, url=%s)", self.device_id, announce_id, audio_url)
-            asyncio.get_event_loop().create_task(
+            asyncio.get_running_loop().create_task(
                 self._play_announcement(audio_url, announce_id)
             )
 
@@ -350,7 +643,7 @@ class DeviceHandler:
         except Exception as exc:
             log.error("[%s] Announcement %s failed: %s", self.device_id, announce_id, exc)
 
-        await self.manager.ws_send_json({
+        self.manager.ws_send_json({
             "type": "announce_done",
             "device_id": self.device_id,
             "announce_id": announce_id,
@@ -368,12 +661,22 @@ class BridgeManager:
     def __init__(self) -> None:
         self._devices: dict[str, DeviceHandler] = {}
         self._pending_probes: set[str] = set()  # hosts currently being probed
+        self._non_voice_hosts: dict[str, str] = {}  # short_name → host of released non-voice devices
         self._ws: Any = None
         self._ws_lock = asyncio.Lock()
         self._ws_reader_task: asyncio.Task | None = None
+        # Outgoing frames in send order: audio as bytes, control messages as
+        # (payload, type); drained by _ws_writer
+        self._ws_out: deque[bytes | bytearray | tuple[str, str | None]] = deque()
+        self._ws_out_frames = 0  # audio frames currently in _ws_out
+        self._ws_out_ready = asyncio.Event()
+        self._ws_writer_task: asyncio.Task | None = None
+        self._ws_retry_delay = WS_RECONNECT_MIN_DELAY
         self._active_streamer: str | None = None  # device_id currently streaming audio
         self.zeroconf: AsyncZeroconf | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None  # set in run()
         self._browser: AsyncServiceBrowser | None = None
+        self._shutdown = asyncio.Event()
 
     # -- Active streamer tracking ----------------------------------------------
 
@@ -384,6 +687,9 @@ class BridgeManager:
         if self._active_streamer == device_id:
             self._active_streamer = None
 
+    def is_active(self, device_id: str) -> bool:
+        return self._active_streamer == device_id
+
     # -- WebSocket to minhome --------------------------------------------------
 
     async def _ensure_ws(self) -> Any:
@@ -393,12 +699,24 @@ class BridgeManager:
 
             log.info("Connecting to minhome at %s", MINHOME_WS_URL)
             try:
-                self._ws = await ws_connect(MINHOME_WS_URL)
+                # PCM audio doesn't compress; skip per-message deflate
+                self._ws = await ws_connect(
+                    MINHOME_WS_URL,
+                    compression=None,
+                    ping_interval=WS_PING_INTERVAL,
+                    ping_timeout=WS_PING_INTERVAL,
+                    open_timeout=WS_OPEN_TIMEOUT,
+                )
+                self._ws_retry_delay = WS_RECONNECT_MIN_DELAY
                 log.info("Connected to minhome WebSocket")
                 if self._ws_reader_task is None or self._ws_reader_task.done():
                     self._ws_reader_task = asyncio.get_running_loop().create_task(
                         self._ws_reader()
                     )
+                if self._ws_writer_task is None or self._ws_writer_task.done():
+                    self._ws_writer_task = asyncio.get_running_loop().create_task(
+                        self._ws_writer()
+                    )
                 # Send the current list of connected devices so the server
                 # knows about them immediately (important on reconnect)
                 await self._send_devices_list()
@@ -407,6 +725,13 @@ class BridgeManager:
                 self._ws = None
             return self._ws
 
+    async def _ws_backoff(self) -> None:
+        """Wait before the next reconnect attempt, doubling the delay up to a cap."""
+        delay = self._ws_retry_delay
+        self._ws_retry_delay = min(delay * 2, WS_RECONNECT_MAX_DELAY)
+        log.info("Retrying minhome WS connection in %.0fs...", delay)
+        await asyncio.sleep(delay)
+
     async def _on_server_disconnect(self) -> None:
         """Handle server WS connection loss: stop discovery and disconnect all devices."""
         if self._browser:
@@ -442,16 +767,14 @@ class BridgeManager:
 
     async def _send_devices_list(self) -> None:
         """Send the list of currently connected devices to the server."""
-        devices = []
-        for device_id, handler in self._devices.items():
-            if handler._device_info is not None:
-                devices.append({
-                    "device_id": device_id,
-                    **handler._device_info,
-                })
+        devices = [
+            asdict(handler._device_info)
+            for handler in self._devices.values()
+            if handler._device_info is not None
+        ]
         if not devices:
             return
-        msg = json.dumps({"type": "devices_list", "devices": devices})
+        msg = _json_encode({"type": "devices_list", "devices": devices})
         log.info("Sending devices_list with %d device(s) to server", len(devices))
         try:
             await self._ws.send(msg)
@@ -466,7 +789,7 @@ class BridgeManager:
                 log.info("WS reader: reconnecting to minhome...")
                 ws = await self._ensure_ws()
                 if ws is None:
-                    await asyncio.sleep(3)
+                    await self._ws_backoff()
                     continue
                 await self._restart_discovery()
             try:
@@ -477,8 +800,9 @@ class BridgeManager:
 
                     # Broadcast messages go to all devices
                     if msg_type == "announce_all":
-                        log.info("Broadcasting announce to %d device(s)", len(self._devices))
-                        for handler in self._devices.values():
+                        handlers = [h for h in self._devices.values() if h.confirmed]
+                        log.info("Broadcasting announce to %d device(s)", len(handlers))
+                        for handler in handlers:
                             handler.handle_server_message({
                                 **msg,
                                 "type": "announce",
@@ -497,28 +821,64 @@ class BridgeManager:
                 log.warning("WS reader error: %s — will reconnect", exc)
                 self._ws = None
                 await self._on_server_disconnect()
-                await asyncio.sleep(3)
+                await self._ws_backoff()
 
-    async def ws_send_json(self, msg: dict) -> None:
-        ws = await self._ensure_ws()
-        if ws is None:
-            log.warning("No minhome WS — dropping message: %s", msg.get("type"))
-            return
-        try:
-            await ws.send(json.dumps(msg))
-        except Exception as exc:
-            log.error("WS send error: %s", exc)
-            self._ws = None
+    def ws_send_json(self, msg: dict) -> None:
+        self.ws_send_text(_json_encode(msg), msg.get("type"))
 
-    async def ws_send_binary(self, data: bytes) -> None:
-        ws = self._ws
-        if ws is None:
+    def ws_send_text(self, payload: str, msg_type: str | None) -> None:
+        """Queue an already-encoded JSON control message behind pending audio."""
+        self._ws_out.append((payload, msg_type))
+        self._ws_out_ready.set()
+
+    def ws_send_binary(self, data: bytes | bytearray) -> None:
+        """Queue an audio frame for the writer task; takes ownership of data."""
+        if self._ws is None:
             return
-        try:
-            await ws.send(data)
-        except Exception as exc:
-            log.error("WS send binary error: %s", exc)
-            self._ws = None
+        out = self._ws_out
+        if self._ws_out_frames >= WS_SEND_QUEUE_FRAMES:
+            for i, item in enumerate(out):
+                if not isinstance(item, tuple):
+                    del out[i]
+                    break
+            self._ws_out_frames -= 1
+            log.debug("WS send queue full — dropped oldest audio frame")
+        out.append(data)
+        self._ws_out_frames += 1
+        self._ws_out_ready.set()
+
+    async def _ws_writer(self) -> None:
+        """Send queued frames to minhome in order, off the calling tasks."""
+        out = self._ws_out
+        while True:
+            if not out:
+                self._ws_out_ready.clear()
+                await self._ws_out_ready.wait()
+                continue
+            item = out.popleft()
+            if isinstance(item, tuple):
+                # Control messages reconnect if needed, as sends always have
+                payload, msg_type = item
+                ws = await self._ensure_ws()
+                if ws is None:
+                    log.warning("No minhome WS — dropping message: %s", msg_type)
+                    continue
+                try:
+                    await ws.send(payload)
+                except Exception as exc:
+                    log.error("WS send error: %s", exc)
+                    self._ws = None
+                continue
+
+            self._ws_out_frames -= 1
+            ws = self._ws
+            if ws is None:
+                continue  # connection lost: stale audio is discarded
+            try:
+                await ws.send(item)
+            except Exception as exc:
+                log.error("WS send binary error: %s", exc)
+                self._ws = None
 
     # -- mDNS discovery --------------------------------------------------------
 
@@ -529,13 +889,17 @@ class BridgeManager:
         name: str,
         state_change: ServiceStateChange,
     ) -> None:
-        """Callback from AsyncServiceBrowser (runs in zeroconf thread)."""
+        """Callback from AsyncServiceBrowser (runs on the event loop)."""
+        # Some responders announce the bare service type with no instance
+        if name == service_type:
+            return
+        loop = self._loop
         if state_change == ServiceStateChange.Added:
-            asyncio.get_event_loop().create_task(self._probe_device(zeroconf, service_type, name))
+            loop.create_task(self._probe_device(zeroconf, service_type, name))
         elif state_change == ServiceStateChange.Removed:
             # Extract short name from full service name
             short_name = name.replace(f".{service_type}", "")
-            asyncio.get_event_loop().create_task(self._remove_device(short_name))
+            loop.create_task(self._remove_device(short_name))
 
     async def _probe_device(self, zeroconf: Any, service_type: str, name: str) -> None:
         """Connect to a discovered device to check if it has voice assistant support."""
@@ -548,7 +912,8 @@ class BridgeManager:
         self._pending_probes.add(short_name)
 
         try:
-            # Get service info for the IP address
+            # Get service info for the IP address (answered from the
+            # zeroconf cache when the browser has already seen the records)
             info = await self.zeroconf.async_get_service_info(
                 service_type, name
             ) if self.zeroconf else None
@@ -564,33 +929,21 @@ class BridgeManager:
                 return
 
             host = addresses[0]
+            if self._non_voice_hosts.get(short_name) == host:
+                log.debug("Skipping known non-voice device: %s (%s)", short_name, host)
+                return
             log.info("Discovered ESPHome device: %s (%s)", short_name, host)
 
-            # Probe the device for voice assistant capability
-            noise_psk = ESPHOME_NOISE_PSK or None
-            probe_client = APIClient(host, ESPHOME_PORT, ESPHOME_PASSWORD, noise_psk=noise_psk)
-            try:
-                await probe_client.connect()
-                device_info = await probe_client.device_info()
-                flags = device_info.voice_assistant_feature_flags_compat(probe_client.api_version)
-                has_voice = bool(flags & VoiceAssistantFeature.VOICE_ASSISTANT)
-                log.info(
-                    "Probed %s: voice_assistant=%s (flags=%d, model=%s)",
-                    short_name, has_voice, flags, device_info.model,
-                )
-            finally:
-                await probe_client.disconnect()
-
-            if has_voice:
-                if self._ws is None:
-                    log.info("Skipping device %s — no server connection", short_name)
-                    return
-                handler = DeviceHandler(host, short_name, self)
-                self._devices[short_name] = handler
-                await handler.start()
-                log.info("Managing voice device: %s (%s) [%d total]", short_name, host, len(self._devices))
-            else:
-                log.debug("Ignoring non-voice device: %s", short_name)
+            if self._ws is None:
+                log.info("Skipping device %s — no server connection", short_name)
+                return
+
+            # Connect once and check voice assistant capability in
+            # DeviceHandler._on_connect, rather than a separate probe
+            # connection followed by a second handshake
+            handler = DeviceHandler(host, short_name, self)
+            self._devices[short_name] = handler
+            await handler.start()
 
         except Exception as exc:
             log.warning("Failed to probe %s: %s", short_name, exc)
@@ -599,11 +952,28 @@ class BridgeManager:
 
     async def _remove_device(self, short_name: str) -> None:
         """Handle a device being removed from mDNS."""
+        # It may come back reflashed with voice support; check it afresh
+        self._non_voice_hosts.pop(short_name, None)
         handler = self._devices.pop(short_name, None)
         if handler:
             log.info("Device removed from network: %s [%d remaining]", short_name, len(self._devices))
             await handler.stop()
 
+    def release_device(self, handler: DeviceHandler, non_voice: bool = False) -> None:
+        """Stop managing a device whose voice support could not be confirmed.
+
+        Called from ReconnectLogic callbacks, so the handler is stopped in a
+        separate task; stopping ReconnectLogic from within its own callback
+        would wait on itself. Devices released as non-voice are remembered
+        by host and skipped on later announcements.
+        """
+        if self._devices.get(handler.device_id) is not handler:
+            return
+        del self._devices[handler.device_id]
+        if non_voice:
+            self._non_voice_hosts[handler.device_id] = handler.host
+        asyncio.get_running_loop().create_task(handler.stop())
+
     # -- Main loop -------------------------------------------------------------
 
     async def run(self) -> None:
@@ -611,14 +981,21 @@ class BridgeManager:
         log.info("Starting Voice Bridge (discovery mode)")
         log.info("Audio base URL: %s", MINHOME_AUDIO_BASE_URL)
         log.info("minhome WS: %s", MINHOME_WS_URL)
+        self._loop = asyncio.get_running_loop()
+
+        # Every outgoing frame is masked; without the C extension websockets
+        # falls back to a pure-Python XOR over each audio payload
+        try:
+            import websockets.speedups  # noqa: F401
+        except ImportError:
+            log.warning("websockets C speedups not available — frame masking is pure Python")
 
         # Connect to minhome WebSocket (retry until successful)
         while True:
             ws = await self._ensure_ws()
             if ws is not None:
                 break
-            log.info("Retrying minhome WS connection in 3s...")
-            await asyncio.sleep(3)
+            await self._ws_backoff()
 
         # Start mDNS discovery
         self.zeroconf = AsyncZeroconf()
@@ -629,9 +1006,10 @@ class BridgeManager:
         )
         log.info("Discovering ESPHome devices on the network...")
 
+        # Idle until SIGTERM (docker stop) or cancellation (Ctrl-C)
+        self._loop.add_signal_handler(signal.SIGTERM, self._shutdown.set)
         try:
-            while True:
-                await asyncio.sleep(3600)
+            await self._shutdown.wait()
         except asyncio.CancelledError:
             pass
         finally: